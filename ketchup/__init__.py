@@ -26,19 +26,68 @@
 import json
 import re
 import sys
-from typing import Iterator, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
 
-import arrow
 import click
 import yaml
 from jsonpath import JSONPath
-from jsonschema import validate
-from jsonschema.exceptions import ValidationError
 from rich import box
 from rich.console import Console
+from rich.live import Live
 from rich.table import Table
+from rich.text import Text
 from slack_sdk import WebClient
 
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+try:
+    from fastjsonschema import JsonSchemaException as ValidationError
+    from fastjsonschema import compile as compile_schema
+except ImportError:  # fastjsonschema not installed
+    from jsonschema import validate
+    from jsonschema.exceptions import ValidationError
+
+    def compile_schema(schema):
+        return lambda data: validate(data, schema)
+
+
+try:
+    import orjson
+
+    def dump_json(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+except ImportError:  # orjson not installed
+
+    def dump_json(obj: Any) -> str:
+        # Same output as orjson.
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader
+
+# Upper limit of Slack searches executed in parallel.
+MAX_CONCURRENT_SEARCHES = 8
+
+# Sort keys for the usual remove_leading_dupes levels.
+_SORT_KEYS = {level: itemgetter(*range(level)) for level in (1, 2, 3)}
+
+_BLANK_LINES_RE = re.compile(r"\n\s*\n")
+_SIMPLE_FIELD_RE = re.compile(r"\$(?:\.\w+|\[\d+\])+")
+_FIELD_STEP_RE = re.compile(r"\w+")
+
 CONFIG_SCHEMA = {
     "type": "array",
     "minLength": 1,
@@ -73,17 +122,22 @@ CONFIG_SCHEMA = {
 }
 
 
+validate_schema = compile_schema(CONFIG_SCHEMA)
+
+
 def validate_config(config):
 
     try:
-        validate(config, CONFIG_SCHEMA)
+        validate_schema(config)
     except ValidationError as err:
         first_line = str(err).split("\n")[0]
         print(f"Invalid config file. Reason: {first_line}")
         sys.exit(1)
 
 
-def remove_leading_dupes(data, level: int):
+def remove_leading_dupes(
+    data: Iterable[Tuple[str, ...]], level: int
+) -> Iterator[List[str]]:
     """
     Removes repeating values within the same column.
 
@@ -91,21 +145,123 @@ def remove_leading_dupes(data, level: int):
         - data: The table to remove leading dupes from.
         - level: How many columns deep to remove leading dupes.
 
+    Yields:
+        - The sorted rows of the provided dataset without any leading dupes.
+    """
+
+    sort_key = _SORT_KEYS.get(level) or itemgetter(*range(level))
+    previous = (None,) * level
+
+    for item in sorted(data, key=sort_key):
+        # Columns are only blanked as long as all columns to their left
+        # repeat the previous row as well.
+        common = 0
+        while common < level and item[common] == previous[common]:
+            common += 1
+        row = list(item)
+        row[:common] = [""] * common
+        previous = item
+        yield row
+
+
+def _required_literals(parsed, ignorecase: bool) -> List[str]:
+    """
+    Collects the literal strings any match of a parsed regex has to contain.
+
+    Args:
+        - parsed: The (sub)pattern as returned by `sre_parse.parse`.
+        - ignorecase: Whether the (sub)pattern matches case insensitive.
+
+    Returns:
+        - The required literal strings.
+    """
+
+    literals = []
+    current = []
+
+    for op, av in parsed:
+        if op is sre_parse.LITERAL and not ignorecase:
+            current.append(chr(av))
+            continue
+
+        if current:
+            literals.append("".join(current))
+            current = []
+
+        if op is sre_parse.SUBPATTERN:
+            _, add_flags, del_flags, sub = av
+            sub_ignorecase = (
+                ignorecase or bool(add_flags & re.IGNORECASE)
+            ) and not del_flags & re.IGNORECASE
+            literals.extend(_required_literals(sub, sub_ignorecase))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            literals.extend(_required_literals(av[2], ignorecase))
+
+    if current:
+        literals.append("".join(current))
+
+    return literals
+
+
+def required_literal(pattern: str) -> str:
+    """
+    Returns the longest literal string any match of `pattern` has to contain.
+
+    Args:
+        - pattern: The regex to inspect.
+
     Returns:
-        - The provided dataset without any leading dupes.
+        - The longest required literal or an empty string when there is none.
     """
 
-    data.sort(key=lambda t: [t[x] for x in range(level)])
+    ignorecase = bool(re.compile(pattern).flags & re.IGNORECASE)
+    return max(
+        _required_literals(sre_parse.parse(pattern), ignorecase), key=len, default=""
+    )
+
+
+def build_message_filter(
+    regex_filter: str, regex_substring: Optional[str]
+) -> Callable[[str], Optional[str]]:
+    """
+    Builds a function which filters and optionally extracts a message.
+
+    Messages lacking the literal text `regex_filter` requires are rejected
+    without invoking the regex engine.
+
+    Args:
+        - regex_filter: The regex which has to match the message.
+        - regex_substring: The regex of which the 1st group is extracted from
+          the message. Can be None.
+
+    Returns:
+        - A function returning None when the message should be skipped
+          otherwise the (extracted) message.
+    """
+
+    filter_re = re.compile(regex_filter)
+    required = required_literal(regex_filter)
+
+    if regex_substring is None:
 
-    for index in range(level):
-        lead = None
-        for item in data:
-            if item[index] != lead:
-                lead = item[index]
-            else:
-                if index == 0 or item[index - 1] == "":
-                    item[index] = ""
-    return data
+        def _filter(message: str) -> Optional[str]:
+            if required in message and filter_re.search(message):
+                return message
+            return None
+
+        return _filter
+
+    substring_re = re.compile(regex_substring)
+
+    def _filter(message: str) -> Optional[str]:
+        if required not in message or not filter_re.search(message):
+            return None
+        try:
+            return substring_re.search(message).group(1)
+        except Exception as err:
+            return f"{message} (unable to extract 1st group of regex {regex_substring} Reason: {err})"
+
+    return _filter
 
 
 def make_clickable(url: str, text: str) -> str:
@@ -123,7 +279,39 @@ def make_clickable(url: str, text: str) -> str:
     return f"[link={url}]{text}[/link]"
 
 
-def build_table(data: List[List[str]]) -> Table:
+def collapse_blank_lines(message: str) -> str:
+    """
+    Removes the empty or whitespace only lines in between other lines.
+
+    Args:
+        - message: The message to collapse.
+
+    Returns:
+        - The message without blank lines.
+    """
+
+    # A blank line needs a newline on both sides.
+    if message.count("\n") < 2:
+        return message
+
+    return _BLANK_LINES_RE.sub("\n", message)
+
+
+def add_table_row(table: Table, row: Iterable[str]) -> None:
+    """
+    Adds `row` to `table`.
+
+    Args:
+        - table: The table to add the row to.
+        - row: The cells containing console markup.
+    """
+
+    # Parse the markup upfront so rendering doesn't have to process each cell
+    # as markup and run the highlighters on it.
+    table.add_row(*[Text.from_markup(cell) for cell in row])
+
+
+def build_table(data: Iterable[Tuple[str, ...]]) -> Table:
     """
     Converts `data` into a  table.
 
@@ -145,11 +333,38 @@ def build_table(data: List[List[str]]) -> Table:
     table.add_column("Type", justify="left", style="red")
 
     for item in remove_leading_dupes(data, 3):
-        table.add_row(*item)
+        add_table_row(table, item)
 
     return table
 
 
+@lru_cache(maxsize=128)
+def _build_query_skeleton(
+    channels: Tuple[str, ...], ignore_users: Tuple[str, ...], done_marker: str
+) -> Tuple[str, str]:
+    """
+    Builds the parts of a Slack search query which don't depend on the
+    search term or date.
+
+    Args:
+        - channels: The channels to query.
+        - ignore_users: Exclude matching messages for the provided users.
+        - done_marker: Exclude messages tagged with this emoji.
+
+    Returns:
+        - The channels part and the exclusions part of the query.
+    """
+
+    query_channels = " ".join([f"in:{channel}" for channel in channels])
+
+    if ignore_users != ():
+        query_ignore_users = " ".join([f"-from:{user}" for user in ignore_users])
+    else:
+        query_ignore_users = ""
+
+    return query_channels, f"-has:{done_marker} {query_ignore_users}"
+
+
 def build_slack_query(
     search_term: str,
     channels: List[str],
@@ -172,19 +387,55 @@ def build_slack_query(
         - The Slack search query.
     """
 
-    query_channels = " ".join([f"in:{channel}" for channel in channels])
-
-    if ignore_users != []:
-        query_ignore_users = " ".join([f"-from:{user}" for user in ignore_users])
-    else:
-        query_ignore_users = ""
+    query_channels, query_exclusions = _build_query_skeleton(
+        tuple(channels), tuple(ignore_users), done_marker
+    )
 
-    query = f"{search_term} {query_channels} after:{after_date} -has:{done_marker} {query_ignore_users}"
+    query = f"{search_term} {query_channels} after:{after_date} {query_exclusions}"
     return query
 
 
+def build_field_extractor(field: str) -> Callable[[dict], Any]:
+    """
+    Builds a function which selects `field` from a Slack message.
+
+    Plain paths such as `$.text` or `$.attachments.0.title` are resolved by
+    direct lookups, anything else is evaluated with JSONPath.
+
+    Args:
+        - field: The field selector in JSONpath syntax.
+
+    Returns:
+        - A function returning the first value matching `field`.
+    """
+
+    jsonpath = JSONPath(field)
+
+    def _jsonpath_extractor(message: dict) -> Any:
+        return jsonpath.parse(message)[0]
+
+    if not _SIMPLE_FIELD_RE.fullmatch(field):
+        return _jsonpath_extractor
+
+    steps = _FIELD_STEP_RE.findall(field)
+
+    def _extractor(message: dict) -> Any:
+        value = message
+        try:
+            for step in steps:
+                if isinstance(value, list) and step.isdigit():
+                    value = value[int(step)]
+                else:
+                    value = value[step]
+        except (IndexError, KeyError, TypeError):
+            return _jsonpath_extractor(message)
+        return value
+
+    return _extractor
+
+
 def query_slack(
-    token: str, query: str, field: str, dump_responses: bool
+    token: str, query: str, field: str, dump_responses: bool, page_size: int
 ) -> Iterator[tuple[str, str, str, str, str]]:
     """
     Query slack
@@ -193,6 +444,9 @@ def query_slack(
         - token: The User OAuth token to authenticate, requires search:read
         - query: The query to execute
         - field: The field selector in JSONpath syntax to select the field to return.
+        - dump_responses: Print the raw Slack messages when True.
+        - page_size: The maximum number of messages to retrieve, newest
+          first.
 
     Yields:
         - A record containing date, channel_name, username, permalink, message
@@ -200,21 +454,93 @@ def query_slack(
     """
 
     client = WebClient(token=token)
-
-    for item in client.search_messages(query=query):
-
-        for message in item["messages"]["matches"]:
-            if dump_responses:
-                print(json.dumps(message))
+    extract_field = build_field_extractor(field)
+    # Messages tend to share the same (UTC) day so only format each day once.
+    dates = {}
+
+    # Without a cursor Slack returns a single page so `page_size` caps the
+    # results, sorting by timestamp keeps the most recent messages.
+    for item in client.search_messages(
+        query=query, count=page_size, sort="timestamp", sort_dir="desc"
+    ):
+
+        matches = item["messages"]["matches"]
+        if dump_responses:
+            # Write each page at once which also keeps the output of
+            # concurrent searches from interleaving.
+            sys.stdout.write("".join(f"{dump_json(message)}\n" for message in matches))
+            sys.stdout.flush()
+
+        for message in matches:
+            ts = float(message["ts"])
+            day = int(ts // 86400)
+            date = dates.get(day)
+            if date is None:
+                date = dates[day] = (
+                    datetime.fromtimestamp(ts, timezone.utc).date().isoformat()
+                )
+            # Channel and user names repeat a lot, interning them lets the
+            # sorting and deduplication of the results compare by identity.
             yield (
-                arrow.get(float(message["ts"])).format("YYYY-MM-DD"),
-                message["channel"]["name"],
-                message["username"],
+                date,
+                sys.intern(message["channel"]["name"]),
+                sys.intern(message["username"]),
                 message["permalink"],
-                JSONPath(field).parse(message)[0],
+                extract_field(message),
             )
 
 
+def run_search(
+    token: str, search: dict, dump_responses: bool, page_size: int
+) -> List[Tuple[str, str, str, str, str]]:
+    """
+    Executes a single search of the config file.
+
+    Args:
+        - token: The User OAuth token to authenticate, requires search:read
+        - search: The search definition from the config file.
+        - dump_responses: Print the raw Slack messages when True.
+        - page_size: The maximum number of messages to retrieve, newest
+          first.
+
+    Returns:
+        - The matching records containing date, channel_name, username,
+          clickable message and search name.
+    """
+
+    slack_query = build_slack_query(
+        search_term=search["query"],
+        channels=search["channels"],
+        after_date=(
+            datetime.now(timezone.utc).date() - timedelta(days=int(search["days_back"]))
+        ).isoformat(),
+        ignore_users=search["ignore_users"],
+        done_marker=search["done_marker"],
+    )
+
+    message_filter = build_message_filter(
+        search["regex_filter"], search["regex_substring"]
+    )
+
+    results = []
+    for date, channel, username, permalink, message in query_slack(
+        token, slack_query, search["field"], dump_responses, page_size
+    ):
+        message = message_filter(message)
+        if message is not None:
+            message = collapse_blank_lines(message)
+            results.append(
+                (
+                    date,
+                    channel,
+                    username,
+                    make_clickable(permalink, message),
+                    search["name"],
+                )
+            )
+    return results
+
+
 @click.command()
 @click.option(
     "--token",
@@ -236,54 +562,67 @@ def query_slack(
     envvar="KETCHUP_DUMP_RESPONSES",
     help="When defined dumps the Slack message format. Useful to debug the JSONpath syntax.",
 )
-def main(token, config_file, dump_responses):
+@click.option(
+    "--page_size",
+    required=False,
+    type=click.IntRange(1, 100),
+    default=100,
+    show_default=True,
+    envvar="KETCHUP_PAGE_SIZE",
+    help="The maximum number of Slack messages to retrieve per search, newest first.",
+)
+def main(token, config_file, dump_responses, page_size):
 
     with open(config_file, "r") as config_fh:
-        config = yaml.safe_load(config_fh)
+        if config_file.endswith(".json"):
+            config = json.load(config_fh)
+        else:
+            config = yaml.load(config_fh, Loader=YamlLoader)
 
     validate_config(config)
 
-    results = []
-
-    for search in config:
-
-        if search["enable"]:
-            slack_query = build_slack_query(
-                search_term=search["query"],
-                channels=search["channels"],
-                after_date=arrow.utcnow()
-                .shift(days=0 - int(search["days_back"]))
-                .format("YYYY-MM-DD"),
-                ignore_users=search["ignore_users"],
-                done_marker=search["done_marker"],
-            )
-
-            for date, channel, username, permalink, message in query_slack(
-                token, slack_query, search["field"], dump_responses
-            ):
-                if re.search(search["regex_filter"], message):
-                    if search["regex_substring"] is not None:
-                        try:
-                            message = re.search(search["regex_substring"], message).group(1)
-                        except Exception as err:
-                            message += f" (unable to extract 1st group of regex {search['regex_substring']} Reason: {err})"
-
-                    # remove empty lines
-                    message = re.sub(r"\n\s*\n", "\n", message)
-                    results.append(
-                        [
-                            date,
-                            channel,
-                            username,
-                            make_clickable(permalink, message),
-                            search["name"],
-                        ]
-                    )
-
-    table = build_table(results)
-
-    console = Console()
-    console.print(table)
+    searches = [search for search in config if search["enable"]]
+    # The rows of each search, kept in config order.
+    search_results = [[] for _ in searches]
+    # Only created when there is something to render.
+    console = None
+
+    if searches:
+        if dump_responses or not sys.stdout.isatty():
+            # Live redirects stdout which would wrap the dumped messages and
+            # doesn't render on non-terminals anyway.
+            progress = None
+            display = nullcontext()
+        else:
+            # Show the rows of each search as soon as it completes. The final
+            # table requires all rows to remove the leading dupes.
+            console = Console(highlight=False, emoji=False)
+            progress = build_table([])
+            display = Live(progress, console=console, transient=True)
+        with ThreadPoolExecutor(
+            max_workers=min(MAX_CONCURRENT_SEARCHES, len(searches))
+        ) as executor, display:
+            futures = {
+                executor.submit(
+                    run_search, token, search, dump_responses, page_size
+                ): index
+                for index, search in enumerate(searches)
+            }
+            for future in as_completed(futures):
+                search_results[futures[future]] = rows = future.result()
+                if progress is not None:
+                    for row in rows:
+                        add_table_row(progress, row)
+
+    results = list(chain.from_iterable(search_results))
+
+    if not results:
+        print("Nothing to catch up on.")
+        return
+
+    if console is None:
+        console = Console(highlight=False, emoji=False)
+    console.print(build_table(results))
 
 
 if __name__ == "__main__":
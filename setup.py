@@ -12,7 +12,6 @@ PROJECT = "ketchup"
 VERSION = "0.2.0"
 
 install_requires = [
-    "arrow==1.2.2",
     "rich==12.6.0",
     "slack-sdk==3.19.5",
     "click==8.1.3",
@@ -63,6 +62,7 @@ setup(
     ],
     extras_require={
         "test": ["pytest", "flake8", "black"],
+        "fast": ["fastjsonschema==2.16.3", "orjson==3.8.6"],
     },
     platforms=["Linux"],
     test_suite="tests.tests",
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_fields.py
+#
+
+import pytest
+from jsonpath import JSONPath
+
+from ketchup import build_field_extractor
+
+MESSAGE = {
+    "text": "hello?",
+    "attachments": [{"title": "first"}, {"title": "second"}],
+    "blocks": [],
+    "numbers": {"0": "zero"},
+}
+
+
+@pytest.mark.parametrize(
+    "field",
+    [
+        "$.text",
+        "$.attachments.0.title",
+        "$.attachments[1].title",
+        "$.numbers.0",
+        "$.attachments[*].title",
+        "$..title",
+    ],
+)
+def test_build_field_extractor(field):
+    """
+    Test the field extractor returns the same value as JSONPath.
+    """
+
+    assert build_field_extractor(field)(MESSAGE) == JSONPath(field).parse(MESSAGE)[0]
+
+
+@pytest.mark.parametrize("field", ["$.blocks.0", "$.missing", "$.text.0"])
+def test_build_field_extractor_missing(field):
+    """
+    Test a missing field raises the same error as JSONPath.
+    """
+
+    with pytest.raises(IndexError):
+        JSONPath(field).parse(MESSAGE)[0]
+    with pytest.raises(IndexError):
+        build_field_extractor(field)(MESSAGE)
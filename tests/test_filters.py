@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_filters.py
+#
+
+import re
+from itertools import product
+
+import pytest
+
+from ketchup import build_message_filter, collapse_blank_lines, required_literal
+
+PATTERNS = [
+    # (pattern, expected required literal)
+    (r"\?(\s+|$)", "?"),
+    (r".*", ""),
+    (r"\d\s(.*)?>", ">"),
+    (r"[ab]c", "c"),
+    # case insensitive
+    (r"(?i)abc", ""),
+    (r"(?i:ab)cd", "cd"),
+    (r"(?i)a(?-i:bc)", "bc"),
+    (r"ab(?-i:cd)", "ab"),
+    # alternations
+    (r"ab|cd", ""),
+    (r"x(ab|cd)y", "x"),
+    # lookarounds
+    (r"(?=abc)d", "d"),
+    (r"(?<=ab)cd", "cd"),
+    (r"(?!ab)cd", "cd"),
+    (r"(?<!ab)c", "c"),
+    # repeats
+    (r"a(bc)*d", "a"),
+    (r"(bc)+d", "bc"),
+    (r"x(?:yz)?w", "x"),
+    (r"(yz){0,3}w", "w"),
+    (r"(yz){2}w", "yz"),
+    (r"ab*c", "a"),
+    (r"a+?bc", "bc"),
+]
+
+# All strings up to 4 characters long built from these characters.
+SAMPLES = [
+    "".join(chars)
+    for length in range(5)
+    for chars in product("abcdAB ?>1", repeat=length)
+]
+
+
+@pytest.mark.parametrize("pattern, expected", PATTERNS)
+def test_required_literal(pattern, expected):
+    """
+    Test the required literal found for a pattern.
+    """
+
+    assert required_literal(pattern) == expected
+
+
+@pytest.mark.parametrize("pattern", [pattern for pattern, _ in PATTERNS])
+def test_required_literal_in_every_match(pattern):
+    """
+    Test every message matching a pattern contains its required literal.
+    """
+
+    literal = required_literal(pattern)
+    pattern_re = re.compile(pattern)
+
+    for sample in SAMPLES:
+        if pattern_re.search(sample):
+            assert literal in sample, sample
+
+
+@pytest.mark.parametrize(
+    "regex_filter, regex_substring",
+    [
+        (r"\?(\s+|$)", None),
+        (r"(?i)ab", None),
+        (r"(?=ab)c|d", None),
+        (r".*", r"\d\s(.*)?>"),
+        (r"a", r"(b+)"),
+        (r"(?i)a", r"(B)"),
+    ],
+)
+def test_build_message_filter_matches_regex(regex_filter, regex_substring):
+    """
+    Test the message filter behaves like applying the regexes directly.
+    """
+
+    message_filter = build_message_filter(regex_filter, regex_substring)
+
+    for sample in SAMPLES:
+        if not re.search(regex_filter, sample):
+            expected = None
+        elif regex_substring is None:
+            expected = sample
+        else:
+            match = re.search(regex_substring, sample)
+            expected = match.group(1) if match else None
+        result = message_filter(sample)
+        if expected is None and result is not None:
+            assert result.startswith(f"{sample} (unable to extract"), sample
+        else:
+            assert result == expected, sample
+
+
+def test_build_message_filter_extraction_error():
+    """
+    Test a message is kept and annotated when the substring can't be extracted.
+    """
+
+    message_filter = build_message_filter(r"\?", r"(JIRA-\d+)")
+
+    assert message_filter("See JIRA-12?") == "JIRA-12"
+    assert message_filter("no ticket?") == (
+        "no ticket? (unable to extract 1st group of regex (JIRA-\\d+) "
+        "Reason: 'NoneType' object has no attribute 'group')"
+    )
+    assert message_filter("no question") is None
+
+
+@pytest.mark.parametrize("message", ["", "one line", "a\n  ", "\n"])
+def test_collapse_blank_lines_single_newline(message):
+    """
+    Test messages with less than two newlines are returned as is.
+    """
+
+    assert collapse_blank_lines(message) is message
+
+
+@pytest.mark.parametrize(
+    "message, expected",
+    [
+        ("a\n\nb", "a\nb"),
+        ("a\n \t\nb", "a\nb"),
+        ("a\n\n \n\n  b", "a\n  b"),
+        ("a\r\n\r\nb", "a\r\nb"),
+        ("\n\nfoo", "\nfoo"),
+        ("foo\n\n", "foo\n"),
+        ("a\nb\nc", "a\nb\nc"),
+    ],
+)
+def test_collapse_blank_lines(message, expected):
+    """
+    Test empty and whitespace only lines are removed.
+    """
+
+    assert collapse_blank_lines(message) == expected
+
+
+def test_collapse_blank_lines_matches_regex():
+    """
+    Test blank lines are collapsed like the original regex substitution.
+    """
+
+    for sample in product("a \t\n", repeat=6):
+        message = "".join(sample)
+        assert collapse_blank_lines(message) == re.sub(
+            r"\n\s*\n", "\n", message
+        ), message
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_slack.py
+#
+
+import time
+
+import pytest
+
+import ketchup
+from ketchup import build_slack_query, query_slack, run_search
+
+MATCHES = [
+    {
+        # 2023-11-14T23:59:59.9 UTC
+        "ts": "1700006399.9",
+        "channel": {"name": "support"},
+        "username": "bob",
+        "permalink": "https://slack/1",
+        "text": "why?",
+    },
+    {
+        # 2023-11-15T00:00:00 UTC
+        "ts": "1700006400.0",
+        "channel": {"name": "support"},
+        "username": "bob",
+        "permalink": "https://slack/2",
+        "text": "how?",
+    },
+]
+
+SEARCH = {
+    "name": "User",
+    "enable": True,
+    "channels": ["support"],
+    "days_back": 7,
+    "done_marker": ":done:",
+    "field": "$.text",
+    "ignore_users": [],
+    "query": "?",
+    "regex_substring": None,
+    "regex_filter": r"\?(\s+|$)",
+}
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    """
+    Replaces the Slack client and returns the queries it receives.
+    """
+
+    received = []
+
+    class WebClient:
+        def __init__(self, token):
+            pass
+
+        def search_messages(self, query, **kwargs):
+            received.append(query)
+            return [{"messages": {"matches": MATCHES}}]
+
+    monkeypatch.setattr(ketchup, "WebClient", WebClient)
+    return received
+
+
+@pytest.fixture
+def local_timezone(monkeypatch):
+    """
+    Runs the test with a local timezone far from UTC.
+    """
+
+    if not hasattr(time, "tzset"):
+        pytest.skip("Changing the timezone requires time.tzset")
+    monkeypatch.setenv("TZ", "Pacific/Kiritimati")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.mark.parametrize(
+    "channels, ignore_users, expected",
+    [
+        (
+            ["support"],
+            [],
+            "? in:support after:2023-02-01 -has::done: ",
+        ),
+        (
+            ["support", "general"],
+            ["smetj", "bot"],
+            "? in:support in:general after:2023-02-01 -has::done: -from:smetj -from:bot",
+        ),
+    ],
+)
+def test_build_slack_query(channels, ignore_users, expected):
+    """
+    Test the Slack query is built from the provided parameters.
+    """
+
+    for _ in range(2):  # second call is served from the cached skeleton
+        query = build_slack_query(
+            search_term="?",
+            channels=channels,
+            after_date="2023-02-01",
+            ignore_users=ignore_users,
+            done_marker=":done:",
+        )
+        assert query == expected
+
+
+def test_query_slack_utc_dates(queries, local_timezone):
+    """
+    Test message dates are the UTC day of the message timestamp.
+    """
+
+    records = list(query_slack("token", "query", "$.text", False, 100))
+
+    assert [record[0] for record in records] == ["2023-11-14", "2023-11-15"]
+
+
+def test_run_search_after_date(queries, local_timezone):
+    """
+    Test the query is limited to messages after `days_back` UTC days ago.
+    """
+
+    rows = run_search("token", SEARCH, False, 100)
+
+    after_date = time.strftime("%Y-%m-%d", time.gmtime(time.time() - 7 * 86400))
+    assert queries == [f"? in:support after:{after_date} -has::done: "]
+    assert [row[0] for row in rows] == ["2023-11-14", "2023-11-15"]
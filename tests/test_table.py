@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+#  test_table.py
+#
+
+from types import GeneratorType
+
+import pytest
+
+from ketchup import remove_leading_dupes
+
+
+@pytest.mark.parametrize(
+    "level, data, expected",
+    [
+        (
+            1,
+            [("b", "x"), ("a", "y"), ("a", "z")],
+            [["a", "y"], ["", "z"], ["b", "x"]],
+        ),
+        (
+            2,
+            [("a", "c", "1"), ("a", "c", "2"), ("a", "d", "3"), ("b", "c", "4")],
+            [["a", "c", "1"], ["", "", "2"], ["", "d", "3"], ["b", "c", "4"]],
+        ),
+        (
+            3,
+            [
+                ("d", "c", "u", "1"),
+                ("d", "c", "u", "2"),
+                ("d", "c", "v", "3"),
+                ("e", "c", "u", "4"),
+            ],
+            [
+                ["d", "c", "u", "1"],
+                ["", "", "", "2"],
+                ["", "", "v", "3"],
+                ["e", "c", "u", "4"],
+            ],
+        ),
+    ],
+)
+def test_remove_leading_dupes_levels(level, data, expected):
+    """
+    Test repeating leading values are blanked up to `level` columns deep.
+    """
+
+    assert list(remove_leading_dupes(data, level)) == expected
+
+
+def test_remove_leading_dupes_later_column_differs():
+    """
+    Test only the leading columns shared with the previous row are blanked.
+    """
+
+    data = [("d", "c", "u1", "m"), ("d", "c", "u2", "m")]
+
+    assert list(remove_leading_dupes(data, 3)) == [
+        ["d", "c", "u1", "m"],
+        ["", "", "u2", "m"],
+    ]
+
+
+def test_remove_leading_dupes_first_column_differs():
+    """
+    Test a row is kept as is when its first column differs.
+    """
+
+    data = [("d1", "c", "u", "m"), ("d2", "c", "u", "m")]
+
+    assert list(remove_leading_dupes(data, 3)) == [
+        ["d1", "c", "u", "m"],
+        ["d2", "c", "u", "m"],
+    ]
+
+
+def test_remove_leading_dupes_empty_cell():
+    """
+    Test an originally empty cell doesn't blank the column next to it.
+    """
+
+    data = [("a", "", "u", "m1"), ("b", "", "u", "m2")]
+
+    assert list(remove_leading_dupes(data, 3)) == [
+        ["a", "", "u", "m1"],
+        ["b", "", "u", "m2"],
+    ]
+
+
+def test_remove_leading_dupes_is_lazy():
+    """
+    Test the rows are yielded as lists without altering the provided tuples.
+    """
+
+    data = [("a", "x"), ("a", "y")]
+    result = remove_leading_dupes(data, 1)
+
+    assert isinstance(result, GeneratorType)
+    assert list(result) == [["a", "x"], ["", "y"]]
+    assert data == [("a", "x"), ("a", "y")]